@@ -9,17 +9,47 @@ import time
 import os
 import json
 import concurrent.futures
+import contextlib
+import queue
 import threading
 
+try:
+    import psutil  # 可选，用于检查浏览器占用的内存
+except ImportError:
+    psutil = None
+
 # 禁用 DevTools 日志
 os.environ['DISABLE_DEVTOOLS_LOGGING'] = 'true'
 
 # 配置文件路径
 CONFIG_FILE = "login_config.json"
 
+# 登录成功后保存的会话cookies，与配置文件中的密码一样需要妥善保管
+COOKIE_FILE = "session_cookies.json"
+cookie_lock = threading.Lock()
+
 # 全局锁，用于保护对DataFrame的写入
 df_lock = threading.Lock()
 
+# 浏览器复用：每个浏览器处理多少个URL后重启，以及进程占用内存(MB)超过多少时重启
+DEFAULT_DRIVER_MAX_PAGES = 200
+DEFAULT_DRIVER_MAX_RSS_MB = 1500
+
+# 页面就绪判断：按 POLL_INTERVAL 秒轮询，每个阶段各自有超时时间（秒），可在配置文件中覆盖
+POLL_INTERVAL = 0.2
+PAGE_READY_TIMEOUT = 15
+# 完成图标可能晚于“Completion”标题渲染，至少等待原先固定的3秒，图标出现即返回
+COMPLETION_ICON_TIMEOUT = 3
+LOGIN_TIMEOUT = 10
+# 重试前的等待时间随重试次数递增
+RETRY_BACKOFF = 0.5
+
+COMPLETION_TITLE_XPATH = "//div[@class='step_title' and text()='Completion']"
+COMPLETION_SVG_XPATH = f"{COMPLETION_TITLE_XPATH}/ancestor::div[contains(@class, 'item_step_process')]//svg"
+LOGIN_SUCCESS_XPATH = "//*[contains(@class, 'ant-layout-header')]"
+LOGIN_FORM_XPATH = "//input[@name='password' or @id='password' or @type='password']"
+LOGIN_ERROR_XPATH = "//*[contains(@class, 'error-message') or contains(@class, 'ant-alert-message') or contains(@class, 'ant-notification-notice-description')]"
+
 def create_config_template():
     """创建配置文件模板"""
     config_template = {
@@ -27,11 +57,16 @@ def create_config_template():
         "username": "",  # 用户名
         "password": "",  # 密码
         "headless": True,  # 是否使用无头模式（建议先用False调试）
-        "implicit_wait": 10,  # 隐式等待时间
         "page_load_timeout": 30,  # 页面加载超时时间
-        "delay_between_requests": 2,  # 请求间隔时间（秒）
+        "poll_interval": POLL_INTERVAL,  # 检查页面是否就绪的间隔（秒）
+        "page_ready_timeout": PAGE_READY_TIMEOUT,  # 等待状态信息出现的超时时间（秒）
+        "completion_icon_timeout": COMPLETION_ICON_TIMEOUT,  # 新版页面等待“Completion”完成图标的超时时间（秒）
+        "login_timeout": LOGIN_TIMEOUT,  # 点击登录后等待跳转的超时时间（秒）
         "max_workers": 5, # 新增：最大并发线程数
-        "skip_auto_login": False # 新增：是否跳过自动化登录，如果已手动登录并保存cookies
+        "skip_auto_login": False, # 新增：是否跳过自动化登录，如果已手动登录并保存cookies
+        "session_check_url": "", # 需要登录才能访问的页面，用于检查已保存的cookies是否仍有效，留空则使用login_url
+        "driver_max_pages": DEFAULT_DRIVER_MAX_PAGES, # 每个浏览器处理多少个URL后重启
+        "driver_max_rss_mb": DEFAULT_DRIVER_MAX_RSS_MB # 浏览器占用内存超过该值(MB)时重启，需安装psutil
     }
     
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
@@ -105,7 +140,8 @@ def setup_driver(config):
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
         # 设置超时时间
-        driver.implicitly_wait(config.get('implicit_wait', 10))
+        # 不使用隐式等待：所有等待都由显式的就绪条件完成，隐式等待会让每次查找不存在的元素都卡满超时
+        driver.implicitly_wait(0)
         driver.set_page_load_timeout(config.get('page_load_timeout', 30))
         
         return driver
@@ -117,6 +153,16 @@ def setup_driver(config):
         print(f"设置浏览器驱动时发生未知错误: {e}")
         return None
 
+def login_settled(login_url):
+    """点击登录后的就绪条件：已跳离登录页、出现登录后的页面元素或出现错误提示"""
+    def predicate(driver):
+        if driver.current_url != login_url and "login" not in driver.current_url:
+            return True
+        if driver.find_elements(By.XPATH, LOGIN_SUCCESS_XPATH):
+            return True
+        return any(element.is_displayed() for element in driver.find_elements(By.XPATH, LOGIN_ERROR_XPATH))
+    return predicate
+
 def auto_login(driver, config, max_retries=3):
     """尝试自动化登录"""
     login_url = config['login_url']
@@ -149,7 +195,11 @@ def auto_login(driver, config, max_retries=3):
             # 尝试判断登录是否成功：检查URL是否已跳转，或等待登录成功后的特定元素
             # 假设登录成功后会跳转到非登录页，或者某个特定元素（如用户头像、仪表盘链接）会出现
             # 请根据实际登录成功后的页面特征调整这里的判断逻辑
-            time.sleep(config.get('delay_between_requests', 2)) # 给页面一些时间加载
+            try:
+                WebDriverWait(driver, config.get('login_timeout', LOGIN_TIMEOUT),
+                              poll_frequency=config.get('poll_interval', POLL_INTERVAL)).until(login_settled(login_url))
+            except TimeoutException:
+                pass  # 超时后仍按下面的条件判断
             
             # 尝试通过URL判断
             if driver.current_url != login_url and "login" not in driver.current_url:
@@ -166,7 +216,7 @@ def auto_login(driver, config, max_retries=3):
                 # print(f"自动化登录：未找到登录成功后的特定元素，当前URL: {driver.current_url}") # 注释掉调试信息
                 # 检查是否有错误消息
                 try:
-                    error_message_element = driver.find_element(By.XPATH, "//*[contains(@class, 'error-message') or contains(@class, 'ant-alert-message') or contains(@class, 'ant-notification-notice-description')]")
+                    error_message_element = driver.find_element(By.XPATH, LOGIN_ERROR_XPATH)
                     if error_message_element.is_displayed():
                         print(f"登录页面错误信息: {error_message_element.text}") # 保留错误信息
                 except NoSuchElementException:
@@ -182,150 +232,282 @@ def auto_login(driver, config, max_retries=3):
             print(f"自动化登录过程中元素加载超时: {login_url} - {e}") # 保留错误信息
             if attempt < max_retries - 1:
                 # print("重试中...") # 注释掉调试信息
-                time.sleep(2)
+                time.sleep(RETRY_BACKOFF * (attempt + 1))
                 continue
             return False
         except NoSuchElementException as e:
             print(f"自动化登录过程中未找到必要元素: {e}") # 保留错误信息
             if attempt < max_retries - 1:
                 # print("重试中...") # 注释掉调试信息
-                time.sleep(2)
+                time.sleep(RETRY_BACKOFF * (attempt + 1))
                 continue
             return False
         except Exception as e:
             print(f"自动化登录过程中发生未知错误: {e}") # 保留错误信息
             if attempt < max_retries - 1:
                 # print("重试中...") # 注释掉调试信息
-                time.sleep(2)
+                time.sleep(RETRY_BACKOFF * (attempt + 1))
                 continue
             return False
     return False
 
-def get_status_from_url(driver, url, xpath, max_retries=3):
-    """从指定URL获取状态信息"""
+def session_expired(driver, config):
+    """访问页面后被重定向到登录页，说明会话已失效"""
+    current_url = driver.current_url
+    return current_url == config['login_url'] or "login" in current_url.lower()
+
+def save_cookies(driver):
+    """保存当前会话的cookies，供其他浏览器和以后的运行直接使用"""
+    data = {"saved_at": time.time(), "cookies": driver.get_cookies()}
+    with cookie_lock:
+        try:
+            with open(COOKIE_FILE + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(COOKIE_FILE + ".tmp", COOKIE_FILE)
+        except OSError as e:
+            print(f"保存cookies失败: {e}")
+
+def load_cookies():
+    """读取已保存的cookies并去掉已过期的，没有可用的cookies时返回空列表"""
+    with cookie_lock:
+        try:
+            with open(COOKIE_FILE, 'r', encoding='utf-8') as f:
+                cookies = json.load(f).get("cookies", [])
+        except (OSError, ValueError):
+            return []
+    now = time.time()
+    return [cookie for cookie in cookies if cookie.get("expiry") is None or cookie["expiry"] > now]
+
+def session_active(driver, config):
+    """等待登录后才有的页面元素出现来判断会话是否有效，出现登录表单时立即判定为无效"""
+    def predicate(driver):
+        if driver.find_elements(By.XPATH, LOGIN_FORM_XPATH):
+            return "login"
+        if driver.find_elements(By.XPATH, LOGIN_SUCCESS_XPATH):
+            return "active"
+        return False
+    try:
+        return WebDriverWait(driver, config.get('login_timeout', LOGIN_TIMEOUT),
+                             poll_frequency=config.get('poll_interval', POLL_INTERVAL)).until(predicate) == "active"
+    except TimeoutException:
+        return False
+
+def restore_session(driver, config):
+    """注入已保存的cookies，并打开检查页确认会话仍然有效"""
+    cookies = load_cookies()
+    if not cookies:
+        return False
+    # 只能为当前所在域名添加cookies，需要先打开该站点
+    driver.get(config['login_url'])
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException:
+            pass  # 其他域名的cookies无法添加，忽略
+    # 已登录时打开登录页也可能停留在原URL，因此不比较URL，而是看页面上是否出现登录后的元素
+    driver.get(config.get('session_check_url') or config['login_url'])
+    return session_active(driver, config)
+
+def login(driver, config):
+    """优先使用已保存的cookies恢复会话，无效时才自动化登录，登录成功后保存新的cookies"""
+    if restore_session(driver, config):
+        return True
+    if auto_login(driver, config):
+        save_cookies(driver)
+        return True
+    return False
+
+def element_status(element):
+    """读取状态元素的文本，文本为空时尝试 title/alt/value 属性"""
+    status = element.text.strip()
+    if status:
+        return status
+    alt_text = element.get_attribute('title') or element.get_attribute('alt') or element.get_attribute('value')
+    return alt_text.strip() if alt_text else ""
+
+def status_ready(xpath, config=None):
+    """
+    状态页的就绪条件。
+
+    新版页面出现“Completion”步骤即就绪，返回 ("new", None)；旧版页面的状态元素有内容即就绪，
+    返回 ("old", 状态)。被重定向到登录页时立即返回 ("login", None)，不必等到超时。
+    两者都还没有时返回 False 继续等待。
+    """
+    def predicate(driver):
+        if config and session_expired(driver, config):
+            return "login", None
+        if driver.find_elements(By.XPATH, COMPLETION_TITLE_XPATH):
+            return "new", None
+        for element in driver.find_elements(By.XPATH, xpath):
+            status = element_status(element)
+            if status:
+                return "old", status
+        return False
+    return predicate
+
+def get_status_from_url(driver, url, xpath, max_retries=3, config=None):
+    """从指定URL获取状态信息，页面就绪后立即读取，不做固定时长的等待"""
+    config = config or {}
+    poll = config.get('poll_interval', POLL_INTERVAL)
+    thread_name = threading.current_thread().name
+    status = "多次尝试失败"
     for attempt in range(max_retries):
+        if attempt > 0:
+            time.sleep(RETRY_BACKOFF * attempt)
         try:
-            # print(f"线程 {threading.current_thread().name}: 正在访问: {url} (尝试 {attempt + 1}/{max_retries})") # 注释掉调试信息
+            # print(f"线程 {thread_name}: 正在访问: {url} (尝试 {attempt + 1}/{max_retries})") # 注释掉调试信息
             driver.get(url)
-            
-            wait = WebDriverWait(driver, 15)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3) # 额外等待确保动态内容加载
-            
+
             try:
-                # 优先检查是否存在“Completion”步骤，以确定页面类型
-                completion_title_xpath = "//div[@class='step_title' and text()='Completion']"
-                driver.find_element(By.XPATH, completion_title_xpath)
-                
-                # 如果存在，说明是新页面类型，使用新逻辑判断状态
-                try:
-                    # 检查与“Completion”关联的SVG元素是否存在
-                    svg_xpath = f"{completion_title_xpath}/ancestor::div[contains(@class, 'item_step_process')]//svg"
-                    driver.find_element(By.XPATH, svg_xpath)
-                    status = "Finished"
-                    print(f"线程 {threading.current_thread().name}: 检测到 'Completion' 步骤已完成 (SVG), 状态: {status}")
-                    return status
-                except NoSuchElementException:
-                    # 没有找到SVG，说明“Completion”步骤未完成
-                    status = "Not Finished Yet" # 或其他表示未完成的状态
-                    print(f"线程 {threading.current_thread().name}: 'Completion' 步骤未完成, 状态: {status}")
-                    return status
+                layout, status = WebDriverWait(driver, config.get('page_ready_timeout', PAGE_READY_TIMEOUT),
+                                               poll_frequency=poll).until(status_ready(xpath, config))
+            except TimeoutException:
+                # 旧版状态元素存在但一直没有内容，或者两种页面元素都没有出现（如任务已删除、无权限）；
+                # 页面已加载完成，再等一轮也不会有变化，只有加载超时和WebDriver错误才重试
+                return "元素内容为空" if driver.find_elements(By.XPATH, xpath) else "元素未找到"
+
+            if layout == "login":
+                # 会话已失效，重试也只会停在登录页，交给调用方重新登录
+                return "会话已失效"
+
+            if layout == "old":
+                print(f"线程 {thread_name}: 获取到状态: {status}") # 保留获取到状态的打印
+                return status
+
+            # 新版页面：与“Completion”关联的SVG图标出现说明该步骤已完成
+            try:
+                WebDriverWait(driver, config.get('completion_icon_timeout', COMPLETION_ICON_TIMEOUT),
+                              poll_frequency=poll).until(
+                    lambda d: d.find_elements(By.XPATH, COMPLETION_SVG_XPATH))
+                status = "Finished"
+                print(f"线程 {thread_name}: 检测到 'Completion' 步骤已完成 (SVG), 状态: {status}")
+            except TimeoutException:
+                status = "Not Finished Yet" # 或其他表示未完成的状态
+                print(f"线程 {thread_name}: 'Completion' 步骤未完成, 状态: {status}")
+            return status
 
-            except NoSuchElementException:
-                # 未找到“Completion”步骤，回退到旧的、通用的状态获取逻辑
-                try:
-                    element = driver.find_element(By.XPATH, xpath)
-                    status = element.text.strip()
-                    
-                    if status:
-                        print(f"线程 {threading.current_thread().name}: 获取到状态: {status}") # 保留获取到状态的打印
-                        return status
-                    else:
-                        # print(f"线程 {threading.current_thread().name}: 元素内容为空") # 注释掉调试信息
-                        alt_text = element.get_attribute('title') or element.get_attribute('alt') or element.get_attribute('value')
-                        if alt_text:
-                            print(f"线程 {threading.current_thread().name}: 从属性获取到: {alt_text}") # 保留从属性获取到状态的打印
-                            return alt_text.strip()
-                        
-                        if attempt < max_retries - 1:
-                            # print(f"线程 {threading.current_thread().name}: 重试中...") # 注释掉调试信息
-                            time.sleep(2)
-                            continue
-                        return "元素内容为空"
-                        
-                except NoSuchElementException:
-                    # print(f"线程 {threading.current_thread().name}: 未找到指定元素 (XPath: {xpath})") # 注释掉，只返回状态
-                    # print(f"线程 {threading.current_thread().name}: 当前页面标题: {driver.title}") # 注释掉调试信息
-                    # print(f"线程 {threading.current_thread().name}: 当前页面URL: {driver.current_url}") # 注释掉调试信息
-                    
-                    if attempt < max_retries - 1:
-                        time.sleep(3)
-                        continue
-                    return "元素未找到"
-                
         except TimeoutException:
-            # print(f"线程 {threading.current_thread().name}: 页面加载超时: {url}") # 注释掉，只返回状态
-            if attempt < max_retries - 1:
-                time.sleep(5)
-                continue
-            return "页面加载超时"
+            # print(f"线程 {thread_name}: 页面加载超时: {url}") # 注释掉，只返回状态
+            status = "页面加载超时"
         except WebDriverException as e:
-            # print(f"线程 {threading.current_thread().name}: WebDriver错误: {e}") # 注释掉，只返回状态
-            if attempt < max_retries - 1:
-                # print(f"线程 {threading.current_thread().name}: 重试中...") # 注释掉调试信息
-                time.sleep(3)
-                continue
-            return f"WebDriver错误: {str(e)}"
+            # print(f"线程 {thread_name}: WebDriver错误: {e}") # 注释掉，只返回状态
+            status = f"WebDriver错误: {str(e)}"
         except Exception as e:
-            # print(f"线程 {threading.current_thread().name}: 获取状态失败: {str(e)}") # 注释掉，只返回状态
-            if attempt < max_retries - 1:
-                # print(f"线程 {threading.current_thread().name}: 重试中...") # 注释掉调试信息
-                time.sleep(3)
-                continue
-            return f"错误: {str(e)}"
-    
-    return "多次尝试失败"
+            # print(f"线程 {thread_name}: 获取状态失败: {str(e)}") # 注释掉，只返回状态
+            status = f"错误: {str(e)}"
 
-def process_url_task(url_info, config, xpath, df):
-    """单个URL处理任务，每个任务有自己的driver实例"""
+    return status
+
+def driver_rss_mb(driver):
+    """浏览器驱动及其所有子进程（Chrome）占用的内存(MB)，未安装psutil或无法读取时返回None"""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+    except (psutil.Error, AttributeError):
+        return None
+
+class DriverPool:
+    """
+    长期复用的已登录浏览器池，大小与并发线程数相同。
+
+    工作线程用 checkout 取出浏览器、用完后 checkin 归还。浏览器在第一次取出时才启动并登录；
+    取出时检查浏览器是否还能响应，归还时若处理的URL数或占用内存超过上限则关闭，下次取出时重新启动。
+    """
+    def __init__(self, config, size):
+        self.config = config
+        self.max_pages = config.get('driver_max_pages', DEFAULT_DRIVER_MAX_PAGES)
+        self.max_rss_mb = config.get('driver_max_rss_mb', DEFAULT_DRIVER_MAX_RSS_MB)
+        self.idle = queue.Queue()
+        self.pages = {}
+        # 先放入空位，浏览器按需启动
+        for _ in range(size):
+            self.idle.put(None)
+
+    def start_driver(self):
+        """启动并登录一个浏览器，返回 (driver, 错误状态)"""
+        driver = setup_driver(self.config)
+        if driver is None:
+            return None, "驱动初始化失败"
+        # skip_auto_login为True时只使用已保存的cookies，不尝试自动化登录
+        if self.config.get('skip_auto_login', False):
+            restore_session(driver, self.config)
+        elif not login(driver, self.config):
+            driver.quit()
+            return None, "自动化登录失败"
+        self.pages[driver] = 0
+        return driver, None
+
+    def discard(self, driver):
+        self.pages.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def checkout(self):
+        """取出一个可用的浏览器，返回 (driver, 错误状态)；失败时 driver 为 None，仍需 checkin"""
+        driver = self.idle.get()
+        if driver is not None:
+            try:
+                driver.current_url  # 健康检查：浏览器已崩溃或被关闭时会抛出异常
+                return driver, None
+            except WebDriverException:
+                self.discard(driver)
+        try:
+            return self.start_driver()
+        except Exception as e:
+            print(f"启动浏览器时发生错误: {e}")
+            return None, "驱动初始化失败"
+
+    def checkin(self, driver):
+        """归还浏览器，达到复用上限的浏览器会被关闭"""
+        if driver is not None:
+            self.pages[driver] = self.pages.get(driver, 0) + 1
+            rss = driver_rss_mb(driver) if self.max_rss_mb else None
+            if self.pages[driver] >= self.max_pages or (rss is not None and rss > self.max_rss_mb):
+                self.discard(driver)
+                driver = None
+        self.idle.put(driver)
+
+    def close(self):
+        while not self.idle.empty():
+            driver = self.idle.get_nowait()
+            if driver is not None:
+                self.discard(driver)
+
+def process_url_task(url_info, pool, xpath):
+    """单个URL处理任务，从浏览器池中取出已登录的浏览器，用完后归还"""
     index, url = url_info
     thread_name = threading.current_thread().name
     # print(f"[{thread_name}] 开始处理第 {index + 1} 行URL: {url}") # 注释掉调试信息
-    
-    driver = None
-    status = "初始化失败"
+
+    if pd.isna(url) or str(url).strip() == '':
+        print(f"[{thread_name}] 第 {index + 1} 行URL为空，跳过")
+        return index, '空URL'
+    url = str(url).strip()
+
+    driver, status = pool.checkout()
     try:
-        driver = setup_driver(config)
         if driver is None:
-            # print(f"[{thread_name}] 驱动初始化失败，跳过URL: {url}") # 注释掉，只返回状态
-            status = "驱动初始化失败"
             return index, status
-        
-        # 自动化登录
-        # 只有当skip_auto_login为False时才尝试登录
-        if not config.get('skip_auto_login', False):
-            if not auto_login(driver, config):
-                # print(f"[{thread_name}] 自动化登录失败，跳过URL: {url}") # 注释掉，只返回状态
-                status = "自动化登录失败"
-                return index, status
-        else:
-            # print(f"[{thread_name}] 跳过自动化登录 (skip_auto_login=True)") # 注释掉，只返回状态
-            pass # 无需打印跳过信息
 
-        if pd.isna(url) or str(url).strip() == '':
-            print(f"[{thread_name}] 第 {index + 1} 行URL为空，跳过")
-            status = '空URL'
-        else:
-            url = str(url).strip()
-            status = get_status_from_url(driver, url, xpath)
+        status = get_status_from_url(driver, url, xpath, config=pool.config)
+
+        # 会话过期时重新登录后再试一次（其他线程可能已经保存了新的cookies）
+        if not pool.config.get('skip_auto_login', False) and session_expired(driver, pool.config):
+            if login(driver, pool.config):
+                status = get_status_from_url(driver, url, xpath, config=pool.config)
+            else:
+                status = "自动化登录失败"
             
     except Exception as e:
         # print(f"[{thread_name}] 处理URL {url} 时发生未捕获错误: {e}") # 注释掉，只返回状态
         status = f"未捕获错误: {str(e)}"
     finally:
-        if driver:
-            # print(f"[{thread_name}] 关闭浏览器...") # 注释掉调试信息
-            driver.quit()
+        pool.checkin(driver)
     
     return index, status
 
@@ -335,6 +517,8 @@ def main():
     config = load_config()
     if config is None:
         return
+    if not config.get('session_check_url'):
+        print("提示: 未配置 session_check_url，将打开 login_url 并根据登录后的页面元素判断已保存的cookies是否有效")
     
     excel_file = r"D:\Rowen\Scripts\Status_inspection.xlsx"
     
@@ -387,9 +571,11 @@ def main():
     # 准备任务列表 (index, url)
     tasks = [(index, url) for index, url in enumerate(url_column)]
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    # 每个线程对应一个长期复用的浏览器，只在启动时登录
+    pool = DriverPool(config, max_workers)
+    with contextlib.closing(pool), concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 提交任务并获取Future对象
-        future_to_url = {executor.submit(process_url_task, task, config, xpath, df): task for task in tasks}
+        future_to_url = {executor.submit(process_url_task, task, pool, xpath): task for task in tasks}
         
         for i, future in enumerate(concurrent.futures.as_completed(future_to_url)):
             original_index, original_url = future_to_url[future]
@@ -421,7 +607,7 @@ def main():
     success_count = 0
     error_count = 0
     for index, status in results:
-        if status not in ["错误", "页面加载超时", "元素未找到", "多次尝试失败", "元素内容为空", "驱动初始化失败", "自动化登录失败"] and not status.startswith("错误:") and not status.startswith("WebDriver错误:") and not status.startswith("未捕获错误:") and not status.startswith("异常:"):
+        if status not in ["错误", "页面加载超时", "元素未找到", "多次尝试失败", "元素内容为空", "驱动初始化失败", "自动化登录失败", "会话已失效"] and not status.startswith("错误:") and not status.startswith("WebDriver错误:") and not status.startswith("未捕获错误:") and not status.startswith("异常:"):
             success_count += 1
         else:
             error_count += 1
@@ -1,10 +1,20 @@
+import time
+
+# 用于测量启动耗时，需在其他导入之前记录
+STARTUP_TIME = time.perf_counter()
+
 import tkinter as tk
-from tkinter import filedialog, scrolledtext
+from tkinter import filedialog, scrolledtext, ttk
 import threading
+import importlib
+import itertools
+import logging
+import queue
 import sys
 import os
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 def install_package(package):
     """如果未安装，则使用pip安装指定的包。"""
@@ -18,32 +28,133 @@ def install_package(package):
         except Exception as e:
             print(f"自动安装 {package} 失败: {e}")
             print(f"请手动运行 'pip install {package}' 后再试。")
-            sys.exit(1)
+            raise
+
+def load_tool(module_name, *packages):
+    """首次用到某个功能时才检查依赖并导入对应的模块，避免启动时导入pandas、selenium等大型库。"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        for package in packages:
+            install_package(package)
+        module = importlib.import_module(module_name)
+    return module
+
+# 控制台日志：工作线程的输出先放入队列，由Tk主循环每隔 LOG_POLL_MS 毫秒批量写入
+LOG_POLL_MS = 50
+LOG_BATCH_SIZE = 2000
+# 控制台最多保留的行数，超出后删除最早的行
+LOG_MAX_LINES = 5000
+
+# 任务启动时所选的日志级别，低于该级别的输出不显示
+LOG_LEVELS = {"全部": logging.DEBUG, "信息": logging.INFO, "警告及错误": logging.WARNING, "仅错误": logging.ERROR}
+ERROR_KEYWORDS = ("错误", "出错", "失败", "Error", "error")
+WARNING_KEYWORDS = ("警告", "注意", "跳过", "Warning", "warning")
 
-# 在导入依赖这些包的模块之前，先确保包已安装
-# 确保核心依赖已安装
-install_package('pandas')
-install_package('openpyxl')
-install_package('selenium')
+def level_of(line):
+    """print 的输出没有级别，按关键字判断，其余都视为普通信息。"""
+    if any(keyword in line for keyword in ERROR_KEYWORDS):
+        return logging.ERROR
+    if any(keyword in line for keyword in WARNING_KEYWORDS):
+        return logging.WARNING
+    return logging.INFO
 
-# 导入功能模块
-from merge_excels import merge_excel_files, get_output_filename
-from convert_ids_to_urls import convert_ids_to_urls
-from report_renamer import rename_reports
-from iq_downloader import download_reports
+class QueueLogger:
+    """
+    替代 sys.stdout，把各线程的输出按行放入队列，由Tk主循环批量写入控制台。
 
-class RedirectText:
+    工作线程不直接操作Tk控件；每个任务在自己的线程中记录日志级别，低于该级别的行直接丢弃。
+    """
     def __init__(self, text_widget):
         self.text_space = text_widget
+        self.queue = queue.Queue()
+        self.context = threading.local()
+        self.text_space.tag_config("WARNING", foreground="darkorange")
+        self.text_space.tag_config("ERROR", foreground="red")
+        self.drain()
 
     def write(self, string):
-        self.text_space.configure(state='normal')
-        self.text_space.insert('end', string)
-        self.text_space.see('end')
-        self.text_space.configure(state='disabled')
+        # print 会分多次写入，攒成整行后再判断级别
+        buffer = getattr(self.context, 'buffer', '') + string
+        *lines, self.context.buffer = buffer.split('\n')
+        for line in lines:
+            self.log(line + '\n', level_of(line))
 
     def flush(self):
-        pass
+        rest = getattr(self.context, 'buffer', '')
+        if rest:
+            self.context.buffer = ''
+            self.log(rest, level_of(rest))
+
+    def log(self, message, level=logging.INFO):
+        if level >= getattr(self.context, 'level', logging.DEBUG):
+            self.queue.put((level, message))
+
+    def run(self, target, level):
+        """在工作线程中以指定的日志级别运行任务。"""
+        self.context.level = level
+        try:
+            target()
+        except Exception as e:
+            print(f"任务运行出错: {e}\n")
+        finally:
+            self.flush()
+
+    def drain(self):
+        """取出队列中已有的日志，一次性写入控制台；积压较多时尽快再次处理。"""
+        items = []
+        try:
+            while len(items) < LOG_BATCH_SIZE:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if items:
+            self.text_space.configure(state='normal')
+            for level, group in itertools.groupby(items, key=lambda item: item[0]):
+                tag = "ERROR" if level >= logging.ERROR else "WARNING" if level >= logging.WARNING else ()
+                self.text_space.insert('end', ''.join(message for _, message in group), tag)
+            line_count = int(self.text_space.index('end-1c').split('.')[0])
+            if line_count > LOG_MAX_LINES:
+                self.text_space.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+            self.text_space.see('end')
+            self.text_space.configure(state='disabled')
+
+        self.text_space.after(1 if len(items) == LOG_BATCH_SIZE else LOG_POLL_MS, self.drain)
+
+# 同时运行的后台任务数上限，超出的任务排队等待
+MAX_JOBS = 2
+# 刷新任务进度和耗时的间隔（毫秒）
+JOB_REFRESH_MS = 500
+
+class Job:
+    """
+    一个后台任务。工作线程通过 report_progress 汇报进度，并在每个处理单元之间检查 cancel_event；
+    界面只在主线程中定时读取这些状态。
+    """
+    def __init__(self, name):
+        self.name = name
+        self.cancel_event = threading.Event()
+        self.done = 0
+        self.total = 0
+        # 开始运行时才记录，排队中为 None
+        self.start_time = None
+        self.finished = False
+
+    def report_progress(self, done, total):
+        self.done, self.total = done, total
+
+    def run(self, task):
+        """在工作线程中运行 task(job)，排队期间已被取消的任务不再运行。"""
+        try:
+            if not self.cancel_event.is_set():
+                self.start_time = time.monotonic()
+                task(self)
+        finally:
+            self.finished = True
+
+def format_elapsed(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
 
 class App(tk.Tk):
     def __init__(self):
@@ -64,6 +175,22 @@ class App(tk.Tk):
         merge_button = tk.Button(merge_frame, text="开始合并", command=self.run_merge_excels)
         merge_button.pack(side=tk.LEFT, padx=5)
 
+        # 数据量很大时逐行合并，避免内存不足
+        self.stream_merge = tk.BooleanVar(value=False)
+        stream_check = tk.Checkbutton(merge_frame, text="低内存模式", variable=self.stream_merge)
+        stream_check.pack(side=tk.LEFT, padx=5)
+
+        # 导出时间段重叠时去掉重复的行，可指定依据的列（逗号分隔），留空按整行判断
+        dedupe_frame = tk.Frame(self)
+        dedupe_frame.pack(padx=20, fill="x")
+
+        self.dedupe = tk.BooleanVar(value=False)
+        dedupe_check = tk.Checkbutton(dedupe_frame, text="合并时去重，依据列:", variable=self.dedupe)
+        dedupe_check.pack(side=tk.LEFT)
+
+        self.dedupe_columns = tk.Entry(dedupe_frame)
+        self.dedupe_columns.pack(side=tk.LEFT, expand=True, fill="x", padx=5)
+
         # Frame for convert ids
         convert_frame = tk.LabelFrame(self, text="转换 ID 为 URL", padx=10, pady=10)
         convert_frame.pack(pady=10, padx=10, fill="x")
@@ -88,18 +215,102 @@ class App(tk.Tk):
         rename_button = tk.Button(rename_frame, text="开始重命名", command=self.run_rename_reports)
         rename_button.pack()
 
+        # Running jobs
+        self.jobs_frame = tk.LabelFrame(self, text="任务", padx=10, pady=5)
+        self.jobs_frame.pack(pady=5, padx=10, fill="x")
+
+        self.no_jobs_label = tk.Label(self.jobs_frame, text="当前没有运行中的任务")
+        self.no_jobs_label.pack()
+
         # Output console
         console_frame = tk.LabelFrame(self, text="输出", padx=10, pady=10)
         console_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
+        level_frame = tk.Frame(console_frame)
+        level_frame.pack(fill="x")
+        tk.Label(level_frame, text="新任务的日志级别:").pack(side=tk.LEFT)
+        self.log_level = tk.StringVar(value="信息")
+        tk.OptionMenu(level_frame, self.log_level, *LOG_LEVELS).pack(side=tk.LEFT)
+
         self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, state='disabled')
         self.console.pack(fill="both", expand=True)
         
         # Redirect stdout
-        sys.stdout = RedirectText(self.console)
+        self.logger = QueueLogger(self.console)
+        sys.stdout = self.logger
         
         self.selected_folder = ""
 
+        # 任务名称 -> (Job, 任务行, 进度条, 耗时标签)
+        self.jobs = {}
+        self.executor = ThreadPoolExecutor(max_workers=MAX_JOBS)
+        self.after(JOB_REFRESH_MS, self.refresh_jobs)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def start_job(self, name, task):
+        """
+        提交后台任务，同一工具同时只能运行一个。
+
+        :param name: 任务名称，同名任务未结束时拒绝再次启动。
+        :param task: 在工作线程中调用 task(job)，通过 job 汇报进度并检查是否已取消。
+        """
+        if name in self.jobs:
+            print(f"错误: '{name}' 正在运行，请等待其结束或先取消。\n")
+            return
+
+        job = Job(name)
+        row = tk.Frame(self.jobs_frame)
+        row.pack(fill="x", pady=2)
+        tk.Label(row, text=name, width=14, anchor="w").pack(side=tk.LEFT)
+        progress = ttk.Progressbar(row, mode="indeterminate", maximum=100)
+        progress.pack(side=tk.LEFT, expand=True, fill="x", padx=5)
+        progress.start(50)
+        elapsed_label = tk.Label(row, text="排队中", width=8)
+        elapsed_label.pack(side=tk.LEFT)
+        tk.Button(row, text="取消", command=lambda: self.cancel_job(name)).pack(side=tk.LEFT, padx=5)
+        self.no_jobs_label.pack_forget()
+        self.jobs[name] = (job, row, progress, elapsed_label)
+
+        # 日志级别取启动时所选的级别
+        level = LOG_LEVELS[self.log_level.get()]
+        self.executor.submit(self.logger.run, lambda: job.run(task), level)
+
+    def cancel_job(self, name):
+        if name in self.jobs:
+            self.jobs[name][0].cancel_event.set()
+            print(f"正在取消 '{name}'，将在当前步骤完成后停止...\n")
+
+    def refresh_jobs(self):
+        """定时刷新各任务的进度和耗时，并移除已结束的任务。"""
+        for name, (job, row, progress, elapsed_label) in list(self.jobs.items()):
+            if job.finished:
+                row.destroy()
+                del self.jobs[name]
+                if job.start_time is not None:
+                    state = "已取消" if job.cancel_event.is_set() else "已结束"
+                    print(f"'{name}' {state}，耗时 {format_elapsed(time.monotonic() - job.start_time)}\n")
+                continue
+            if job.start_time is None:
+                continue
+            # 任务汇报总数后改为显示确定的进度
+            if job.total:
+                if str(progress['mode']) == "indeterminate":
+                    progress.stop()
+                    progress.config(mode="determinate")
+                progress.config(value=100 * job.done / job.total)
+            elapsed_label.config(text=format_elapsed(time.monotonic() - job.start_time))
+
+        if not self.jobs:
+            self.no_jobs_label.pack()
+        self.after(JOB_REFRESH_MS, self.refresh_jobs)
+
+    def on_close(self):
+        # 通知所有任务停止，排队中的任务不再启动
+        for job, _, _, _ in self.jobs.values():
+            job.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
     def browse_folder(self):
         self.selected_folder = filedialog.askdirectory()
         if self.selected_folder:
@@ -110,30 +321,40 @@ class App(tk.Tk):
         if not self.selected_folder:
             print("错误: 请先选择一个包含Excel文件的文件夹。\n")
             return
-        
-        def task():
+
+        # Tk控件只能在主线程中读取，提交任务前先取出选项
+        folder = self.selected_folder
+        stream = self.stream_merge.get()
+        dedupe = self.dedupe.get()
+        columns = self.dedupe_columns.get().replace('，', ',')
+        key_columns = [c.strip() for c in columns.split(',') if c.strip()] or None
+
+        def task(job):
             try:
-                output_filename = get_output_filename(self.selected_folder)
+                merge_excels = load_tool('merge_excels', 'pandas', 'openpyxl')
+                output_filename = merge_excels.get_output_filename(folder)
                 if not output_filename:
-                    print(f"在路径 '{self.selected_folder}' 下没有找到Excel文件。\n")
+                    print(f"在路径 '{folder}' 下没有找到Excel文件。\n")
                     return
 
                 print(f"自动生成的输出文件名: {output_filename}")
-                merge_excel_files(self.selected_folder, output_filename)
+                merge = merge_excels.stream_merge_excel_files if stream else merge_excels.merge_excel_files
+                merge(folder, output_filename, dedupe, key_columns, job.report_progress, job.cancel_event)
             except Exception as e:
                 print(f"合并过程中发生错误: {e}\n")
 
-        threading.Thread(target=task).start()
+        self.start_job("合并 Excel 文件", task)
 
     def run_convert_ids(self):
-        def task():
+        def task(job):
             try:
                 print("开始转换 'Status_Inspection.xlsx' 中的ID...\n")
-                convert_ids_to_urls()
+                load_tool('convert_ids_to_urls', 'openpyxl').convert_ids_to_urls(
+                    on_progress=job.report_progress, cancel_event=job.cancel_event)
             except Exception as e:
                 print(f"转换过程中发生错误: {e}\n")
         
-        threading.Thread(target=task).start()
+        self.start_job("转换 ID 为 URL", task)
 
     def run_rename_reports(self):
         if not self.selected_folder:
@@ -141,13 +362,16 @@ class App(tk.Tk):
             return
         
         # 使用 lambda 将 print 函数作为回调传递
-        task = lambda: rename_reports(self.selected_folder, lambda msg: print(msg))
-        threading.Thread(target=task).start()
+        folder = self.selected_folder
+        task = lambda job: load_tool('report_renamer', 'openpyxl').rename_reports(
+            folder, lambda msg: print(msg), job.report_progress, job.cancel_event)
+        self.start_job("重命名周报", task)
 
     def run_iq_download(self):
         # 使用 lambda 将 print 函数作为回调传递
-        task = lambda: download_reports(lambda msg: print(msg))
-        threading.Thread(target=task).start()
+        task = lambda job: load_tool('iq_downloader', 'selenium').download_reports(
+            lambda msg: print(msg), job.report_progress, job.cancel_event)
+        self.start_job("iQ报告下载", task)
 
     def stop_selenium_processes(self):
         print("正在尝试终止所有Chrome及驱动进程...\n")
@@ -159,6 +383,16 @@ class App(tk.Tk):
         except Exception as e:
             print(f"终止进程时发生错误: {e}\n")
 
+def report_startup_time(app):
+    """窗口首次空闲时输出启动耗时及是否已导入大型库，然后关闭窗口。"""
+    elapsed = time.perf_counter() - STARTUP_TIME
+    heavy = [name for name in ('pandas', 'openpyxl', 'selenium') if name in sys.modules]
+    sys.__stdout__.write(f"启动耗时: {elapsed * 1000:.0f} ms，已导入: {', '.join(heavy) or '无'}\n")
+    app.destroy()
+
 if __name__ == "__main__":
     app = App()
+    # 使用 --startup-benchmark 参数运行时只测量窗口打开所需的时间
+    if "--startup-benchmark" in sys.argv:
+        app.after_idle(report_startup_time, app)
     app.mainloop()
\ No newline at end of file
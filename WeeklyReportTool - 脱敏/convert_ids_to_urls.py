@@ -1,32 +1,88 @@
+import os
+import sys
 import openpyxl
 
-def convert_ids_to_urls():
+# {id} is replaced with the task ID from the first column
+URL_TEMPLATE = "http://-.com/details?taskId={id}&pid=51&locale=en-US"
+
+def convert_sheet(source, target, url_template):
+    """
+    Streams the rows of source into target, writing the URL for the ID
+    in column A to column B. Returns the number of IDs converted.
     """
-    Reads IDs from the first column of 'Status_Inspection.xlsx',
+    converted = 0
+    for row in source.iter_rows(values_only=True):
+        row = list(row)
+        if row and row[0]:
+            # Construct the URL and put it in column B of the same row
+            if len(row) < 2:
+                row.append(None)
+            row[1] = url_template.format(id=row[0])
+            converted += 1
+        target.append(row)
+    return converted
+
+def convert_ids_to_urls(file_paths=None, url_template=URL_TEMPLATE, on_progress=None, cancel_event=None):
+    """
+    Reads IDs from the first column of the active sheet of each workbook,
     converts them to URLs, and saves them to column B of the same file.
+
+    The input is read in read-only mode and written row by row to a
+    write-only workbook, which replaces the original only once it has been
+    saved completely. Cell formatting is not preserved.
+
+    :param file_paths: A path or list of paths, defaults to 'Status_Inspection.xlsx'.
+    :param url_template: URL pattern with an {id} placeholder.
+    :param on_progress: Optional callback on_progress(done, total), called after each file.
+    :param cancel_event: Optional threading.Event; remaining files are skipped once it is set.
+    :return: The total number of IDs converted.
     """
-    try:
-        # Load the workbook and select the active sheet
-        workbook = openpyxl.load_workbook('Status_Inspection.xlsx')
-        sheet = workbook.active
-
-        # Iterate over the rows in the first column of the source sheet
-        for row_index, row in enumerate(sheet.iter_rows(min_row=1, max_col=1, values_only=True), start=1):
-            if row[0]:
-                original_id = row[0]
-                # Construct the URL
-                url = f"http://-.com/details?taskId={original_id}&pid=51&locale=en-US"
-                # Write the URL to column B of the same row
-                sheet.cell(row=row_index, column=2, value=url)
-
-        # Save the workbook (overwrite original file)
-        workbook.save('Status_Inspection.xlsx')
-        print("Successfully updated 'Status_Inspection.xlsx' with URLs in column B.")
-
-    except FileNotFoundError:
-        print("Error: 'Status_Inspection.xlsx' not found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-
-# The main execution block is removed to allow this script to be imported as a module.
-# The convert_ids_to_urls() function will be called from the GUI application.
+    if file_paths is None:
+        file_paths = ['Status_Inspection.xlsx']
+    elif isinstance(file_paths, str):
+        file_paths = [file_paths]
+
+    total = 0
+    for done, file_path in enumerate(file_paths):
+        if cancel_event is not None and cancel_event.is_set():
+            print("Conversion cancelled.")
+            break
+        temp_path = file_path + '.tmp'
+        try:
+            source = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                target = openpyxl.Workbook(write_only=True)
+                converted = 0
+                for sheet in source.worksheets:
+                    target_sheet = target.create_sheet(sheet.title)
+                    if sheet.title == source.active.title:
+                        converted = convert_sheet(sheet, target_sheet, url_template)
+                    else:
+                        for row in sheet.iter_rows(values_only=True):
+                            target_sheet.append(row)
+                # Keep the same sheet active so the next run converts it again
+                target.active = source.index(source.active)
+                target.save(temp_path)
+            finally:
+                source.close()
+
+            # Replace the original only after the new file is fully written
+            os.replace(temp_path, file_path)
+            total += converted
+            print(f"Successfully updated '{file_path}' with {converted} URLs in column B.")
+
+        except FileNotFoundError:
+            print(f"Error: '{file_path}' not found.")
+        except Exception as e:
+            print(f"An error occurred while converting '{file_path}': {e}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        if on_progress:
+            on_progress(done + 1, len(file_paths))
+    return total
+
+# Called from the GUI application when imported; when run directly, the
+# workbooks to convert can be passed on the command line.
+if __name__ == "__main__":
+    convert_ids_to_urls(sys.argv[1:] or None)
@@ -66,8 +66,13 @@ def _export_data(driver, wait, period_desc, log_callback):
     except (TimeoutException, NoSuchElementException) as e:
         log_callback(f"[{period_desc}] 失败: {e}")
 
-def download_reports(log_callback):
-    """Main function to drive the download process."""
+def download_reports(log_callback, on_progress=None, cancel_event=None):
+    """
+    Main function to drive the download process.
+
+    on_progress(done, total) is called after each time period; once
+    cancel_event is set, no further periods are started.
+    """
     try:
         with open("login_config.json", "r") as f:
             config = json.load(f)
@@ -86,7 +91,10 @@ def download_reports(log_callback):
     
     try:
         is_first_run = True
-        for start_date, end_date in periods:
+        for done, (start_date, end_date) in enumerate(periods):
+            if cancel_event is not None and cancel_event.is_set():
+                log_callback("下载已取消。\n")
+                return
             period_desc = f"{start_date}-{end_date}"
             url = _generate_url(start_date, end_date)
             
@@ -100,6 +108,8 @@ def download_reports(log_callback):
 
             wait.until(EC.presence_of_element_located((By.ID, "__next")))
             _export_data(driver, wait, period_desc, log_callback)
+            if on_progress:
+                on_progress(done + 1, len(periods))
             
             log_callback(f"[{period_desc}] 等待1.5秒后处理下一个时间段...")
             time.sleep(1.5)
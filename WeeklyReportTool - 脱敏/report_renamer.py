@@ -3,16 +3,24 @@ import re
 from datetime import datetime
 import openpyxl
 
-def rename_reports(target_dir, log_callback):
+def rename_reports(target_dir, log_callback, on_progress=None, cancel_event=None):
     """
     分析并重命名指定目录下的周报Excel文件。
 
     :param target_dir: 包含周报文件的目录路径。
     :param log_callback: 用于将日志消息发送回GUI的函数。
+    :param on_progress: 可选，每处理完一个文件调用 on_progress(已完成数, 总数)。
+    :param cancel_event: 可选的 threading.Event，被设置后不再处理剩余的文件。
     """
     log_callback(f"开始处理文件夹 '{target_dir}' 中的周报...\n")
 
-    for filename in os.listdir(target_dir):
+    filenames = os.listdir(target_dir)
+    for done, filename in enumerate(filenames):
+        if cancel_event is not None and cancel_event.is_set():
+            log_callback("\n重命名已取消。\n")
+            return
+        if on_progress:
+            on_progress(done, len(filenames))
         if filename.endswith(".xlsx"):
             # 防止重命名已处理过的文件
             if re.match(r'^\d{4}( (H1|H2))? \d+\.xlsx$', filename):
@@ -82,4 +90,6 @@ def rename_reports(target_dir, log_callback):
             except Exception as e:
                 log_callback(f"警告：无法处理文件 '{filename}'。原因：{e}。正在跳过文件。")
                 continue
+    if on_progress:
+        on_progress(len(filenames), len(filenames))
     log_callback("\n所有文件处理完毕。\n")
\ No newline at end of file
@@ -1,6 +1,15 @@
+import time
+
+# 用于测量启动耗时，需在其他导入之前记录
+STARTUP_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, scrolledtext
 import threading
+import importlib
+import itertools
+import logging
+import queue
 import sys
 import os
 import re
@@ -18,29 +27,98 @@ def install_package(package):
         except Exception as e:
             print(f"自动安装 {package} 失败: {e}")
             print(f"请手动运行 'pip install {package}' 后再试。")
-            sys.exit(1)
-
-# 在导入依赖这些包的模块之前，先确保包已安装
-install_package('pandas')
-install_package('openpyxl')
-
-import pandas as pd
-import openpyxl
-from merge_excels import merge_excel_files, get_output_filename
-from convert_ids_to_urls import convert_ids_to_urls
-
-class RedirectText:
+            raise
+
+def load_tool(module_name, *packages):
+    """首次用到某个功能时才检查依赖并导入对应的模块，避免启动时导入pandas、selenium等大型库。"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        for package in packages:
+            install_package(package)
+        module = importlib.import_module(module_name)
+    return module
+
+# 控制台日志：工作线程的输出先放入队列，由Tk主循环每隔 LOG_POLL_MS 毫秒批量写入
+LOG_POLL_MS = 50
+LOG_BATCH_SIZE = 2000
+# 控制台最多保留的行数，超出后删除最早的行
+LOG_MAX_LINES = 5000
+
+# 任务启动时所选的日志级别，低于该级别的输出不显示
+LOG_LEVELS = {"全部": logging.DEBUG, "信息": logging.INFO, "警告及错误": logging.WARNING, "仅错误": logging.ERROR}
+ERROR_KEYWORDS = ("错误", "出错", "失败", "Error", "error")
+WARNING_KEYWORDS = ("警告", "注意", "跳过", "Warning", "warning")
+
+def level_of(line):
+    """print 的输出没有级别，按关键字判断，其余都视为普通信息。"""
+    if any(keyword in line for keyword in ERROR_KEYWORDS):
+        return logging.ERROR
+    if any(keyword in line for keyword in WARNING_KEYWORDS):
+        return logging.WARNING
+    return logging.INFO
+
+class QueueLogger:
+    """
+    替代 sys.stdout，把各线程的输出按行放入队列，由Tk主循环批量写入控制台。
+
+    工作线程不直接操作Tk控件；每个任务在自己的线程中记录日志级别，低于该级别的行直接丢弃。
+    """
     def __init__(self, text_widget):
         self.text_space = text_widget
+        self.queue = queue.Queue()
+        self.context = threading.local()
+        self.text_space.tag_config("WARNING", foreground="darkorange")
+        self.text_space.tag_config("ERROR", foreground="red")
+        self.drain()
 
     def write(self, string):
-        self.text_space.configure(state='normal')
-        self.text_space.insert('end', string)
-        self.text_space.see('end')
-        self.text_space.configure(state='disabled')
+        # print 会分多次写入，攒成整行后再判断级别
+        buffer = getattr(self.context, 'buffer', '') + string
+        *lines, self.context.buffer = buffer.split('\n')
+        for line in lines:
+            self.log(line + '\n', level_of(line))
 
     def flush(self):
-        pass
+        rest = getattr(self.context, 'buffer', '')
+        if rest:
+            self.context.buffer = ''
+            self.log(rest, level_of(rest))
+
+    def log(self, message, level=logging.INFO):
+        if level >= getattr(self.context, 'level', logging.DEBUG):
+            self.queue.put((level, message))
+
+    def run(self, target, level):
+        """在工作线程中以指定的日志级别运行任务。"""
+        self.context.level = level
+        try:
+            target()
+        except Exception as e:
+            print(f"任务运行出错: {e}\n")
+        finally:
+            self.flush()
+
+    def drain(self):
+        """取出队列中已有的日志，一次性写入控制台；积压较多时尽快再次处理。"""
+        items = []
+        try:
+            while len(items) < LOG_BATCH_SIZE:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if items:
+            self.text_space.configure(state='normal')
+            for level, group in itertools.groupby(items, key=lambda item: item[0]):
+                tag = "ERROR" if level >= logging.ERROR else "WARNING" if level >= logging.WARNING else ()
+                self.text_space.insert('end', ''.join(message for _, message in group), tag)
+            line_count = int(self.text_space.index('end-1c').split('.')[0])
+            if line_count > LOG_MAX_LINES:
+                self.text_space.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+            self.text_space.see('end')
+            self.text_space.configure(state='disabled')
+
+        self.text_space.after(1 if len(items) == LOG_BATCH_SIZE else LOG_POLL_MS, self.drain)
 
 class App(tk.Tk):
     def __init__(self):
@@ -61,6 +139,22 @@ class App(tk.Tk):
         merge_button = tk.Button(merge_frame, text="开始合并", command=self.run_merge_excels)
         merge_button.pack(side=tk.LEFT, padx=5)
 
+        # 数据量很大时逐行合并，避免内存不足
+        self.stream_merge = tk.BooleanVar(value=False)
+        stream_check = tk.Checkbutton(merge_frame, text="低内存模式", variable=self.stream_merge)
+        stream_check.pack(side=tk.LEFT, padx=5)
+
+        # 导出时间段重叠时去掉重复的行，可指定依据的列（逗号分隔），留空按整行判断
+        dedupe_frame = tk.Frame(self)
+        dedupe_frame.pack(padx=20, fill="x")
+
+        self.dedupe = tk.BooleanVar(value=False)
+        dedupe_check = tk.Checkbutton(dedupe_frame, text="合并时去重，依据列:", variable=self.dedupe)
+        dedupe_check.pack(side=tk.LEFT)
+
+        self.dedupe_columns = tk.Entry(dedupe_frame)
+        self.dedupe_columns.pack(side=tk.LEFT, expand=True, fill="x", padx=5)
+
         # Frame for convert ids
         convert_frame = tk.LabelFrame(self, text="转换 ID 为 URL", padx=10, pady=10)
         convert_frame.pack(pady=10, padx=10, fill="x")
@@ -72,14 +166,26 @@ class App(tk.Tk):
         console_frame = tk.LabelFrame(self, text="输出", padx=10, pady=10)
         console_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
+        level_frame = tk.Frame(console_frame)
+        level_frame.pack(fill="x")
+        tk.Label(level_frame, text="新任务的日志级别:").pack(side=tk.LEFT)
+        self.log_level = tk.StringVar(value="信息")
+        tk.OptionMenu(level_frame, self.log_level, *LOG_LEVELS).pack(side=tk.LEFT)
+
         self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, state='disabled')
         self.console.pack(fill="both", expand=True)
         
         # Redirect stdout
-        sys.stdout = RedirectText(self.console)
+        self.logger = QueueLogger(self.console)
+        sys.stdout = self.logger
         
         self.selected_folder = ""
 
+    def start_task(self, task):
+        """在后台线程中运行任务，日志级别取启动时所选的级别。"""
+        level = LOG_LEVELS[self.log_level.get()]
+        threading.Thread(target=self.logger.run, args=(task, level)).start()
+
     def browse_folder(self):
         self.selected_folder = filedialog.askdirectory()
         if self.selected_folder:
@@ -91,30 +197,49 @@ class App(tk.Tk):
             print("错误: 请先选择一个包含Excel文件的文件夹。\n")
             return
         
+        # Tk控件只能在主线程中读取，启动线程前先取出选项
+        folder = self.selected_folder
+        stream = self.stream_merge.get()
+        dedupe = self.dedupe.get()
+        columns = self.dedupe_columns.get().replace('，', ',')
+        key_columns = [c.strip() for c in columns.split(',') if c.strip()] or None
+
         def task():
             try:
-                output_filename = get_output_filename(self.selected_folder)
+                merge_excels = load_tool('merge_excels', 'pandas', 'openpyxl')
+                output_filename = merge_excels.get_output_filename(folder)
                 if not output_filename:
-                    print(f"在路径 '{self.selected_folder}' 下没有找到Excel文件。\n")
+                    print(f"在路径 '{folder}' 下没有找到Excel文件。\n")
                     return
 
                 print(f"自动生成的输出文件名: {output_filename}")
-                merge_excel_files(self.selected_folder, output_filename)
+                merge = merge_excels.stream_merge_excel_files if stream else merge_excels.merge_excel_files
+                merge(folder, output_filename, dedupe, key_columns)
             except Exception as e:
                 print(f"合并过程中发生错误: {e}\n")
 
-        threading.Thread(target=task).start()
+        self.start_task(task)
 
     def run_convert_ids(self):
         def task():
             try:
                 print("开始转换 'Status_Inspection.xlsx' 中的ID...\n")
-                convert_ids_to_urls()
+                load_tool('convert_ids_to_urls', 'openpyxl').convert_ids_to_urls()
             except Exception as e:
                 print(f"转换过程中发生错误: {e}\n")
         
-        threading.Thread(target=task).start()
+        self.start_task(task)
+
+def report_startup_time(app):
+    """窗口首次空闲时输出启动耗时及是否已导入大型库，然后关闭窗口。"""
+    elapsed = time.perf_counter() - STARTUP_TIME
+    heavy = [name for name in ('pandas', 'openpyxl', 'selenium') if name in sys.modules]
+    sys.__stdout__.write(f"启动耗时: {elapsed * 1000:.0f} ms，已导入: {', '.join(heavy) or '无'}\n")
+    app.destroy()
 
 if __name__ == "__main__":
     app = App()
+    # 使用 --startup-benchmark 参数运行时只测量窗口打开所需的时间
+    if "--startup-benchmark" in sys.argv:
+        app.after_idle(report_startup_time, app)
     app.mainloop()
\ No newline at end of file
@@ -1,45 +1,144 @@
+import csv
+import hashlib
 import os
+import numpy as np
+import openpyxl
 import pandas as pd
-import subprocess
-import sys
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def install_package(package):
-    """如果未安装，则使用pip安装指定的包。"""
-    try:
-        __import__(package)
-    except ImportError:
-        print(f"正在安装 {package}...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+# 单个Excel工作表最多的行数，流式合并时超出后自动续写到新的工作表
+EXCEL_MAX_ROWS = 1048576
+
+# 解析结果的缓存目录，位于输入文件夹内，未改动的文件直接读取缓存而不再解析Excel
+CACHE_DIRNAME = ".merge_cache"
+
+def read_excel_file(file_path):
+    """在子进程中读取单个Excel文件，返回 (数据, 耗时秒数)。"""
+    start = time.perf_counter()
+    df = pd.read_excel(file_path)
+    return df, time.perf_counter() - start
+
+def cache_path(file_path):
+    """按文件路径、大小和修改时间生成缓存文件路径，文件改动后会对应到新的缓存。"""
+    stat = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(os.path.dirname(file_path), CACHE_DIRNAME, digest + '.pkl')
+
+def with_row_count(output_filename, count):
+    """把输出文件名末尾的数量替换为实际行数。"""
+    return re.sub(r'\d+(?=\.\w+$)', str(count), output_filename)
+
+def print_duplicate_counts(counts):
+    """打印每个来源文件被去掉的重复行数。"""
+    for file, count in counts.items():
+        if count:
+            print(f"去重: {file} 中有 {count} 行与之前的行重复")
+    print(f"共去掉 {sum(counts.values())} 行重复数据")
+
+def drop_duplicate_rows(data, sources, key_columns=None):
+    """
+    对每行计算64位哈希，一次性去掉重复行，保留最先出现的一行。
+
+    :param data: 合并后的数据。
+    :param sources: 与 data 等长的来源文件名数组。
+    :param key_columns: 判断重复所依据的列，为空时按整行判断。
+    :return: 去重后的数据。
+    """
+    subset = data[key_columns] if key_columns else data
+    duplicated = pd.util.hash_pandas_object(subset, index=False).duplicated().to_numpy()
+    print_duplicate_counts(pd.Series(sources[duplicated]).value_counts().to_dict())
+    return data[~duplicated].reset_index(drop=True)
 
-def merge_excel_files(input_path, output_filename):
+def merge_excel_files(input_path, output_filename, dedupe=False, key_columns=None,
+                      on_progress=None, cancel_event=None):
     """
     合并指定文件夹中的所有Excel文件到一个文件中。
 
     :param input_path: 包含Excel文件的文件夹路径。
     :param output_filename: 合并后输出的Excel文件名。
+    :param dedupe: 是否去掉各文件之间重复的行（导出时间段有重叠或重复导出时）。
+    :param key_columns: 去重所依据的列，为空时按整行判断。
+    :param on_progress: 可选，每处理完一个文件调用 on_progress(已完成数, 总数)。
+    :param cancel_event: 可选的 threading.Event，被设置后尽快停止。
     """
-    # 确保必要的库已安装
-    install_package('pandas')
-    install_package('openpyxl')
-
     # 查找所有Excel文件
     excel_files = [f for f in os.listdir(input_path) if f.endswith(('.xlsx', '.xls'))]
     if not excel_files:
         print(f"在路径 '{input_path}' 下没有找到Excel文件。")
         return
 
-    # 读取并合并
-    all_data = pd.DataFrame()
+    start = time.perf_counter()
+    frames = {}
+    cache_dir = os.path.join(input_path, CACHE_DIRNAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    caches = {file: cache_path(os.path.join(input_path, file)) for file in excel_files}
+
+    def report_progress():
+        if on_progress:
+            on_progress(len(frames), len(excel_files))
+
+    # 未改动的文件直接读取缓存
+    pending = []
     for file in excel_files:
-        file_path = os.path.join(input_path, file)
+        file_start = time.perf_counter()
         try:
-            df = pd.read_excel(file_path)
-            all_data = pd.concat([all_data, df], ignore_index=True)
-            print(f"已处理文件: {file}")
+            frames[file] = pd.read_pickle(caches[file])
+            print(f"已从缓存读取: {file}（{len(frames[file])} 行，耗时 {time.perf_counter() - file_start:.2f} 秒）")
+            report_progress()
+        except FileNotFoundError:
+            pending.append(file)
         except Exception as e:
-            print(f"处理文件 {file} 时出错: {e}")
+            print(f"文件 {file} 的缓存已损坏，将重新读取: {e}")
+            pending.append(file)
+
+    # 新增或改动的文件多进程并行读取并写入缓存
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as executor:
+            futures = [(file, executor.submit(read_excel_file, os.path.join(input_path, file))) for file in pending]
+            for file, future in futures:
+                if cancel_event is not None and cancel_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    print("合并已取消。")
+                    return
+                try:
+                    df, elapsed = future.result()
+                    frames[file] = df
+                    print(f"已处理文件: {file}（{len(df)} 行，耗时 {elapsed:.2f} 秒）")
+                    report_progress()
+                except Exception as e:
+                    print(f"处理文件 {file} 时出错: {e}")
+                    continue
+                try:
+                    df.to_pickle(caches[file])
+                except OSError as e:
+                    print(f"写入文件 {file} 的缓存时出错: {e}")
+
+    # 清理已经过期的缓存
+    current = set(caches.values())
+    for name in os.listdir(cache_dir):
+        if os.path.join(cache_dir, name) not in current:
+            os.remove(os.path.join(cache_dir, name))
+
+    # 全部读完后只合并一次，避免在循环中反复复制已合并的数据
+    ordered = [file for file in excel_files if file in frames]
+    all_data = pd.concat([frames[file] for file in ordered], ignore_index=True) if ordered else pd.DataFrame()
+    print(f"读取并合并共耗时 {time.perf_counter() - start:.2f} 秒")
+
+    if dedupe and not all_data.empty:
+        missing = [column for column in key_columns or [] if column not in all_data.columns]
+        if missing:
+            print(f"错误: 去重列不存在: {', '.join(missing)}")
+            return
+        sources = np.repeat(ordered, [len(frames[file]) for file in ordered])
+        total = len(all_data)
+        all_data = drop_duplicate_rows(all_data, sources, key_columns)
+        if len(all_data) < total:
+            output_filename = with_row_count(output_filename, len(all_data))
+            print(f"去重后输出文件名更新为: {output_filename}")
 
     # 保存合并后的文件
     if not all_data.empty:
@@ -49,19 +148,192 @@ def merge_excel_files(input_path, output_filename):
     else:
         print("没有数据可以合并。")
 
-def get_output_filename(folder_path):
-    """根据文件夹内的Excel文件名生成输出文件名，格式为 '2020 - {current year} {total}.xlsx'。"""
-    excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.xls'))]
+def normalize_header(cells):
+    """与pandas读取时一致：空列名记为 'Unnamed: n'，重复的列名依次加上 '.1'、'.2' 后缀。"""
+    header = []
+    for i, cell in enumerate(cells):
+        name = f"Unnamed: {i}" if cell is None else str(cell)
+        candidate, n = name, 0
+        while candidate in header:
+            n += 1
+            candidate = f"{name}.{n}"
+        header.append(candidate)
+    return header
+
+def read_header(file_path):
+    """只读取第一个工作表的第一行作为表头。"""
+    if file_path.endswith('.xls'):
+        return list(pd.read_excel(file_path, nrows=0).columns)
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        first_row = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        return normalize_header(first_row)
+    finally:
+        workbook.close()
+
+def iter_excel_rows(file_path):
+    """逐行产出第一个工作表的数据行（不含表头），xlsx以只读模式读取，不会把整个文件载入内存。"""
+    if file_path.endswith('.xls'):
+        # openpyxl 不支持 .xls，旧格式最多65536行，直接用pandas读取
+        for row in pd.read_excel(file_path).itertuples(index=False):
+            yield tuple(None if pd.isna(value) else value for value in row)
+        return
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(min_row=2, values_only=True):
+            if any(value is not None for value in row):
+                yield row
+    finally:
+        workbook.close()
+
+def write_rows(output_path, header, rows):
+    """把行流式写入CSV或只写模式的xlsx，返回写入的行数。"""
+    count = 0
+    if output_path.lower().endswith('.csv'):
+        # utf-8-sig 使Excel能正确显示中文
+        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    for row in rows:
+        if sheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+            sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+            sheet.append(header)
+            sheet_rows = 1
+        sheet.append(row)
+        sheet_rows += 1
+        count += 1
+    if sheet is None:
+        workbook.create_sheet("Sheet1").append(header)
+    workbook.save(output_path)
+    return count
+
+def stream_merge_excel_files(input_path, output_filename, dedupe=False, key_columns=None,
+                             on_progress=None, cancel_event=None):
+    """
+    以流式方式合并指定文件夹中的所有Excel文件，逐行读取并直接写入输出文件，内存占用与数据量无关。
+
+    各文件的列按列名对齐，先读取所有表头得到合并后的列，某个文件缺少的列留空。
+    去重时只为每个不重复的行保留一个16字节的摘要。
+
+    :param input_path: 包含Excel文件的文件夹路径。
+    :param output_filename: 合并后输出的文件名，以 .csv 结尾时输出CSV，否则输出xlsx。
+    :param dedupe: 是否去掉各文件之间重复的行。
+    :param key_columns: 去重所依据的列，为空时按整行判断。
+    :param on_progress: 可选，每处理完一个文件调用 on_progress(已完成数, 总数)。
+    :param cancel_event: 可选的 threading.Event，被设置后尽快停止。
+    :return: 写入的数据行数。
+    """
+    # 查找所有Excel文件，跳过上次合并的输出文件
+    excel_files = [f for f in os.listdir(input_path)
+                   if f.endswith(('.xlsx', '.xls')) and f != output_filename]
     if not excel_files:
-        return None
+        print(f"在路径 '{input_path}' 下没有找到Excel文件。")
+        return 0
+
+    # 先只读取表头，按出现顺序得到所有列
+    headers = {}
+    columns = []
+    for file in excel_files:
+        try:
+            headers[file] = read_header(os.path.join(input_path, file))
+        except Exception as e:
+            print(f"读取文件 {file} 的表头时出错: {e}")
+            continue
+        columns += [name for name in headers[file] if name not in columns]
+    column_index = {name: i for i, name in enumerate(columns)}
+
+    missing = [column for column in key_columns or [] if column not in column_index]
+    if dedupe and missing:
+        print(f"错误: 去重列不存在: {', '.join(missing)}")
+        return 0
+    key_positions = [column_index[column] for column in key_columns] if key_columns else None
+    seen = set()
+    duplicate_counts = {}
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def merged_rows():
+        for done, (file, header) in enumerate(headers.items()):
+            positions = [column_index[name] for name in header]
+            start = time.perf_counter()
+            count = 0
+            try:
+                for row in iter_excel_rows(os.path.join(input_path, file)):
+                    if cancelled():
+                        return
+                    merged = [None] * len(columns)
+                    for position, value in zip(positions, row):
+                        merged[position] = value
+                    if dedupe:
+                        # 128位摘要内存固定且几乎不会碰撞；按repr计算，1、1.0和True不会被视为相同
+                        key = tuple(merged[i] for i in key_positions) if key_positions else tuple(merged)
+                        key = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).digest()
+                        if key in seen:
+                            duplicate_counts[file] = duplicate_counts.get(file, 0) + 1
+                            continue
+                        seen.add(key)
+                    yield merged
+                    count += 1
+                print(f"已处理文件: {file}（{count} 行，耗时 {time.perf_counter() - start:.2f} 秒）")
+            except Exception as e:
+                print(f"处理文件 {file} 时出错: {e}")
+            if on_progress:
+                on_progress(done + 1, len(headers))
+
+    output_path = os.path.join(input_path, output_filename)
+    count = write_rows(output_path, columns, merged_rows())
+    if cancelled():
+        os.remove(output_path)
+        print("合并已取消。")
+        return 0
+    if count == 0:
+        os.remove(output_path)
+        print("没有数据可以合并。")
+        return 0
+
+    if dedupe:
+        print_duplicate_counts(duplicate_counts)
+        if duplicate_counts:
+            renamed = with_row_count(output_filename, count)
+            os.replace(output_path, os.path.join(input_path, renamed))
+            output_filename, output_path = renamed, os.path.join(input_path, renamed)
+            print(f"去重后输出文件名更新为: {output_filename}")
+
+    print(f"\n所有Excel文件已成功合并到 '{output_path}'，共 {count} 行")
+    expected = expected_row_count(input_path, exclude=output_filename)
+    if expected and expected != count and not duplicate_counts:
+        print(f"注意: 文件名中的数量合计为 {expected}，与实际合并的 {count} 行不一致。")
+    return count
+
+def expected_row_count(folder_path, exclude=None):
+    """把各Excel文件名最后一段中的数字相加，即文件名所标注的数据条数合计。"""
     total = 0
-    for f in excel_files:
+    for f in os.listdir(folder_path):
+        if not f.endswith(('.xlsx', '.xls')) or f == exclude:
+            continue
         name = os.path.splitext(f)[0]
         parts = name.split()
         if parts:
             match = re.search(r'\d+', parts[-1])
             if match:
                 total += int(match.group())
+    return total
+
+def get_output_filename(folder_path):
+    """根据文件夹内的Excel文件名生成输出文件名，格式为 '2020 - {current year} {total}.xlsx'。"""
+    excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.xls'))]
+    if not excel_files:
+        return None
+    total = expected_row_count(folder_path)
     current_year = datetime.now().strftime('%Y')
     return f"2020 - {current_year} {total}.xlsx"
 
@@ -71,8 +343,20 @@ if __name__ == "__main__":
     if os.path.isdir(folder_path):
         output_file = get_output_filename(folder_path)
         if output_file:
-            print(f"自动生成的输出文件名: {output_file}")
-            merge_excel_files(folder_path, output_file)
+            stream = input("是否使用低内存的流式合并（y/N）: ").strip().lower() == 'y'
+            dedupe = input("是否去掉重复的行（y/N）: ").strip().lower() == 'y'
+            key_columns = None
+            if dedupe:
+                columns = input("去重依据的列名（用逗号分隔，直接回车按整行判断）: ")
+                key_columns = [c.strip() for c in columns.replace('，', ',').split(',') if c.strip()] or None
+            if stream:
+                if input("输出格式（xlsx 或 csv，直接回车默认 xlsx）: ").strip().lower() == 'csv':
+                    output_file = os.path.splitext(output_file)[0] + '.csv'
+                print(f"自动生成的输出文件名: {output_file}")
+                stream_merge_excel_files(folder_path, output_file, dedupe, key_columns)
+            else:
+                print(f"自动生成的输出文件名: {output_file}")
+                merge_excel_files(folder_path, output_file, dedupe, key_columns)
         else:
             print(f"在路径 '{folder_path}' 下没有找到Excel文件。")
     else: